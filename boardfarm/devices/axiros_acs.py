@@ -39,6 +39,7 @@ from boardfarm.exceptions import (
 )
 from boardfarm.lib.bft_pexpect_helper import bft_pexpect_helper
 from boardfarm.lib.common import get_class_name_in_stack, scp_from
+from boardfarm.lib.contingency_cache import invalidate_acs
 from boardfarm.lib.dns import DNS
 from boardfarm.lib.linux_nw_utility import NwFirewall
 from boardfarm.lib.network_testing import kill_process, tcpdump_capture
@@ -1156,6 +1157,8 @@ class AxirosACS(Intercept, base_acs.BaseACS, AcsTemplate):
 
         :return: returns factory reset response
         """
+        # the CPE drops its ACS session, check it again before the next test
+        invalidate_acs(self)
         CmdOptTypeStruct_data = self._get_cmd_data(Sync=True, Lifetime=20)
         CPEIdClassStruct_data = self._get_class_data(cpeid=self.cpeid)
 
@@ -1218,6 +1221,8 @@ class AxirosACS(Intercept, base_acs.BaseACS, AcsTemplate):
 
         :return: returns reboot RPC response
         """
+        # the CPE drops its ACS session, check it again before the next test
+        invalidate_acs(self)
         if self.cpeid is None:
             self.cpeid = self.dev.board._cpeid
 
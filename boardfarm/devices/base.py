@@ -9,6 +9,7 @@ import logging
 import signal
 
 from boardfarm.lib.bft_pexpect_helper import bft_pexpect_helper
+from boardfarm.lib.contingency_cache import invalidate_acs
 
 logger = logging.getLogger("bft")
 
@@ -31,6 +32,13 @@ class BaseDevice(bft_pexpect_helper):
         """Get ipv6 address of interface."""
         raise NotImplementedError
 
+    def get_interface_ipaddrs(self, interface):
+        """Get both the ipv4 and the ipv6 address of interface, as a dict."""
+        return {
+            "ipv4": self.get_interface_ipaddr(interface),
+            "ipv6": self.get_interface_ip6addr(interface),
+        }
+
     def get_interface_macaddr(self, interface):
         """Get the interface mac address."""
         raise NotImplementedError
@@ -118,6 +126,8 @@ class BaseDevice(bft_pexpect_helper):
 
     def reset(self, break_into_uboot=False):
         """Power-cycle this device."""
+        # the board drops its ACS session, check it again before the next test
+        invalidate_acs()
         if not break_into_uboot:
             self.power.reset()
             return
@@ -1,20 +1,85 @@
 """Generic Templates."""
+import asyncio
+import functools
+import re
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Optional
-
-from boardfarm_lgi_shared.lib.ofw.dmcli import DMCLIAPI
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional
 
 import boardfarm.devices.connection_decider as conn_dec
 from boardfarm.devices import get_device_mapping_class
-from boardfarm.devices.base_devices.mib_template import MIBTemplate
 from boardfarm.exceptions import CodeError
 from boardfarm.lib.bft_pexpect_helper import bft_pexpect_helper as PexpectHelper
-from boardfarm.lib.env_helper import EnvHelper
-from boardfarm.lib.linux_nw_utility import DeviceNwUtility, NwFirewall
 from boardfarm.lib.signature_checker import __MetaSignatureChecker
 
-from .fxo_template import FXOTemplate
+# only used in type hints: not imported at runtime, as the DMCLI API in
+# particular pulls in the whole boardfarm_lgi_shared package
+if TYPE_CHECKING:
+    from boardfarm_lgi_shared.lib.ofw.dmcli import DMCLIAPI
+
+    from boardfarm.devices.base_devices.mib_template import MIBTemplate
+    from boardfarm.lib.env_helper import EnvHelper
+    from boardfarm.lib.linux_nw_utility import DeviceNwUtility, NwFirewall
+
+    from .fxo_template import FXOTemplate
+
+# upper bound of consoles being connected/closed at the same time
+_MAX_CONSOLE_WORKERS = 8
+
+# boardfarm's own MIBs, resolved once at import time
+_MIBS_PATH = str(Path(__file__).resolve().parent.parent.parent / "resources" / "mibs")
+
+# pexpect delays overridden on consoles with fast_io enabled
+_FAST_IO_DELAYS = {
+    "delayafterread": None,
+    "delaybeforesend": None,
+}
+
+# only this many trailing characters of the buffer are searched for the prompt
+_PROMPT_SEARCH_WINDOW = 4096
+
+
+def _compile_prompt(prompt: Any, flags: int) -> Any:
+    """Return the prompt with its string pattern(s) precompiled.
+
+    :param prompt: prompt regex, list of prompt regexes or None
+    :type prompt: Any
+    :param flags: re flags to compile the string patterns with
+    :type flags: int
+    :return: the compiled pattern(s), anything else is returned unchanged
+    :rtype: Any
+    """
+    if isinstance(prompt, str):
+        return re.compile(prompt, flags)
+    if isinstance(prompt, (list, tuple)):
+        return [re.compile(p, flags) if isinstance(p, str) else p for p in prompt]
+    return prompt
+
+
+def _run_on_consoles(func: Callable, items: Iterable) -> List[Any]:
+    """Run func on every item concurrently and return the results in order.
+
+    Console session setup/teardown is I/O bound, hence the calls are fanned
+    out over a thread pool. All the calls are always waited for, so that a
+    failing console does not leave the others orphaned; the first exception
+    (in item order) is then re-raised.
+
+    :param func: callable invoked with each item as its only argument
+    :type func: Callable
+    :param items: items (e.g. consoles or connection commands) to process
+    :type items: Iterable
+    :return: the results of func, in the same order as items
+    :rtype: List[Any]
+    """
+    items = list(items)
+    if len(items) < 2:
+        return [func(item) for item in items]
+    workers = min(len(items), _MAX_CONSOLE_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(func, item) for item in items]
+    # the executor context waits for all the futures to complete
+    return [future.result() for future in futures]
 
 
 class ConsoleTemplate(PexpectHelper, metaclass=__MetaSignatureChecker):
@@ -24,6 +89,39 @@ class ConsoleTemplate(PexpectHelper, metaclass=__MetaSignatureChecker):
     conn_type = None
     conn_cmd = None
     prompt = None
+    # Drop the pexpect sleeps before each send and after each read.
+    # Some consoles (e.g. slow serial lines, password prompts) may lose input
+    # sent too early: derived classes can set this to False to get back the
+    # pexpect defaults.
+    fast_io = True
+
+    def _spawn(self, *args, **kwargs):
+        """Spawn the session, then disable the pexpect delays if fast_io is set.
+
+        pexpect (re)sets the delays every time the session is spawned, i.e.
+        on every (re)connection, hence they are overridden here. Delays set
+        explicitly once connected are kept.
+        """
+        super()._spawn(*args, **kwargs)
+        if self.fast_io:
+            for key, value in _FAST_IO_DELAYS.items():
+                setattr(self, key, value)
+
+    def _prompt_re(self) -> Any:
+        """Return the precompiled prompt, recompiled only if prompt changed.
+
+        The prompt list is often extended in place (e.g. prompt.append()),
+        hence the cache is keyed on a snapshot of its value.
+        """
+        prompt = self.prompt
+        # same flags pexpect compiles string patterns with
+        flags = re.DOTALL | (re.IGNORECASE if self.ignorecase else 0)
+        key = (tuple(prompt) if isinstance(prompt, list) else prompt, flags)
+        cached = self.__dict__.get("_prompt_cache")
+        if cached is None or cached[0] != key:
+            cached = (key, _compile_prompt(prompt, flags))
+            self.__dict__["_prompt_cache"] = cached
+        return cached[1]
 
     @abstractmethod
     def __init__(self, conn_type: str, conn_cmd: str, **kwargs):
@@ -42,6 +140,53 @@ class ConsoleTemplate(PexpectHelper, metaclass=__MetaSignatureChecker):
     def close(self):
         """Closes the connection to the device"""
 
+    def expect(self, pattern, *args, **kwargs):
+        """Wait for the pattern, pattern None meaning the console prompt.
+
+        The prompt (pattern None or self.prompt, as e.g. in check_output())
+        is matched with its precompiled regex(es).
+
+        With pattern None (and expect_prompt()) the prompt is also searched
+        only in the tail of the buffer (the prompt is the last thing printed):
+        this saves rescanning the whole output of long running commands on
+        every read. The before attribute still holds the full output.
+        Callers passing self.prompt keep searching the whole buffer, as they
+        may be expecting an earlier prompt among several ones.
+        """
+        if pattern is None:
+            pattern = self._prompt_re()
+            if len(args) < 2:
+                kwargs.setdefault("searchwindowsize", _PROMPT_SEARCH_WINDOW)
+        elif pattern is self.prompt:
+            pattern = self._prompt_re()
+        return super().expect(pattern, *args, **kwargs)
+
+    def expect_prompt(self, timeout=30):
+        """Expect prompt."""
+        self.expect(None, timeout=timeout)
+
+    async def expect_async(self, pattern, timeout=30):
+        """Wait for the pattern without blocking the event loop.
+
+        Allows waiting on several consoles at once from a single thread, e.g.
+        via asyncio.gather(). Same return value and exceptions as expect(),
+        i.e. a timeout raises PexpectErrorTimeout.
+
+        expect() is run on the default executor rather than with pexpect's
+        async_ mode: the latter binds the console to the first event loop it
+        is awaited from (closing its read pipe transport closes the console),
+        whereas each asyncio.run() call runs a new loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.expect, pattern, timeout=timeout)
+        )
+
+    async def sendline_async(self, s=""):
+        """Send a line without blocking the event loop (see sendline())."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.sendline, s)
+
     def spawn_device(self, **kwargs):
         """Spwans a console device based on the class type specified in
         the paramter device_type. Currently the communication with the console
@@ -57,17 +202,18 @@ class BoardHWTemplate(metaclass=__MetaSignatureChecker):
         """Base initialisation of the DUT HW interface."""
         conn_cmd = kwargs.get("conn_cmd")
         conn_type = kwargs.get("conn_type")
-        self.consoles = [ConsoleTemplate(conn_type, c) for c in conn_cmd]
+        self.consoles = _run_on_consoles(
+            lambda cmd: ConsoleTemplate(conn_type, cmd), conn_cmd
+        )
         self.connect(*args, **kwargs)
 
     def get_mibs_path(self):
-        return [str(Path(__file__).parent.parent.parent.joinpath("resources/mibs"))]
+        return [_MIBS_PATH]
 
     @abstractmethod
     def connect(self, *args, **kwargs):
         """This may not be needed. Connects to the DUT."""
-        for c in self.consoles:
-            c.connect()
+        _run_on_consoles(lambda c: c.connect(), self.consoles)
 
     def is_production(self):
         """Returns True if no debug features are available on the DUT. E.g.
@@ -91,15 +237,14 @@ class BoardHWTemplate(metaclass=__MetaSignatureChecker):
 
     @abstractmethod
     def close(self):
-        for c in self.consoles:
-            c.close()
+        _run_on_consoles(lambda c: c.close(), self.consoles)
 
 
 class BoardSWTemplate(metaclass=__MetaSignatureChecker):
-    voice: Optional[FXOTemplate] = None
-    mib: Optional[MIBTemplate] = None
-    nw_utility: Optional[DeviceNwUtility] = None
-    firewall: Optional[NwFirewall] = None
+    voice: Optional["FXOTemplate"] = None
+    mib: Optional["MIBTemplate"] = None
+    nw_utility: Optional["DeviceNwUtility"] = None
+    firewall: Optional["NwFirewall"] = None
     tones_dict: Dict[str, Dict[str, str]] = {}
 
     @property
@@ -112,7 +257,7 @@ class BoardSWTemplate(metaclass=__MetaSignatureChecker):
         raise NotImplementedError
 
     @property
-    def dmcli(self) -> DMCLIAPI:
+    def dmcli(self) -> "DMCLIAPI":
         raise NotImplementedError
 
     @dmcli.setter
@@ -262,7 +407,7 @@ class BoardTemplate(metaclass=__MetaSignatureChecker):
         """Base initialisation of the board device. Used to store the necessary
         values that are then used to drive the HW via the AbstractBoardHW
         derived class."""
-        self.env_helper: EnvHelper
+        self.env_helper: "EnvHelper"
 
     @property
     @abstractmethod
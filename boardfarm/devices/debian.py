@@ -23,6 +23,7 @@ from termcolor import colored, cprint
 from boardfarm.exceptions import PexpectErrorTimeout
 from boardfarm.lib.bft_pexpect_helper import bft_pexpect_helper
 from boardfarm.lib.common import retry_on_exception
+from boardfarm.lib.contingency_cache import invalidate_prompts
 from boardfarm.lib.dhcpoption import configure_option
 from boardfarm.lib.network_helper import valid_ipv4
 from boardfarm.lib.regexlib import ValidIpv4AddressRegex
@@ -332,6 +333,8 @@ class DebianBox(linux.LinuxDevice):
 
     def reset(self):
         """Reset the debian linux device."""
+        # the prompt has to be checked again before the next test
+        invalidate_prompts(self)
         self.sendline("reboot")
         self.expect(["going down", "disconnected"])
         try:
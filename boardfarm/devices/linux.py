@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import binascii
 import ipaddress
+import json
 import logging
 import os
 import re
@@ -123,6 +124,38 @@ class LinuxInterface:
 
         return self._get_interface_ip6addr_generic(interface, "global")
 
+    def get_interface_ipaddrs(self, interface: str) -> Dict[str, str]:
+        """Get both the ipv4 and the global ipv6 address of the interface.
+
+        Both are read with a single "ip -j addr" command, falling back to
+        get_interface_ipaddr() and get_interface_ip6addr() if iproute2 JSON
+        output is not available on the device.
+
+        :param interface: interface name
+        :type interface: str
+        :return: the addresses, as {"ipv4": ..., "ipv6": ...}
+        :rtype: Dict[str, str]
+        """
+        output = self.check_output(f"ip -j addr show dev {interface}")
+        try:
+            data = json.loads(output[output.find("[") : output.rfind("]") + 1])
+            addrs = [a for iface in data for a in iface.get("addr_info", [])]
+            ipv4 = next(a["local"] for a in addrs if a.get("family") == "inet")
+            ipv6 = next(
+                a["local"]
+                for a in addrs
+                if a.get("family") == "inet6"
+                and ipaddress.IPv6Address(a["local"]).is_global
+            )
+        except (ValueError, KeyError, TypeError, AttributeError, StopIteration):
+            logger.debug(f"ip -j addr show dev {interface} not usable: {output}")
+            return {
+                "ipv4": self.get_interface_ipaddr(interface),
+                "ipv6": self.get_interface_ip6addr(interface),
+            }
+        logger.debug(f"ip -j addr show dev {interface} IPV4 {ipv4} IPV6 {ipv6}")
+        return {"ipv4": ipv4, "ipv6": ipv6}
+
     def get_interface_link_local_ip6addr(self, interface):
         """function helps in getting ipv6 link local address of the interface
         :param device: device name
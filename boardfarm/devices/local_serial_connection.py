@@ -1,9 +1,57 @@
 """Connection using Local Serial."""
+import array
+import fcntl
+import logging
+import os
+import re
+import termios
+
 import pexpect
 
 from boardfarm.lib.bft_pexpect_helper import bft_pexpect_helper
 from boardfarm.lib.regexlib import telnet_ipv4_conn
 
+logger = logging.getLogger("bft")
+
+# from linux/serial.h, not all of them are exported by the termios module
+TIOCGSERIAL = getattr(termios, "TIOCGSERIAL", 0x541E)
+TIOCSSERIAL = getattr(termios, "TIOCSSERIAL", 0x541F)
+ASYNC_LOW_LATENCY = 0x2000
+
+
+def set_low_latency(port):
+    """Enable the low latency mode of a serial port.
+
+    USB-serial adapters (e.g. FTDI) buffer the received data for up to 16ms
+    by default before handing it over, low latency mode drops that to ~1ms.
+    The setting is lost when the adapter is unplugged, hence it should be
+    (re)applied on every connection.
+
+    :param port: path to the serial port, e.g. /dev/ttyUSB0
+    :type port: string
+    :return: True if low latency mode is set, False otherwise
+    :rtype: bool
+    """
+    try:
+        fd = os.open(port, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+    except OSError as e:
+        logger.debug(f"Cannot open {port} to set low latency mode: {e}")
+        return False
+    try:
+        # struct serial_struct, the flags are the 5th int
+        buf = array.array("i", [0] * 32)
+        fcntl.ioctl(fd, TIOCGSERIAL, buf)
+        if not buf[4] & ASYNC_LOW_LATENCY:
+            buf[4] |= ASYNC_LOW_LATENCY
+            fcntl.ioctl(fd, TIOCSSERIAL, buf)
+        return True
+    except OSError as e:
+        # not every serial driver supports TIOCSSERIAL
+        logger.debug(f"Cannot set low latency mode on {port}: {e}")
+        return False
+    finally:
+        os.close(fd)
+
 
 class LocalSerialConnection:
     """LocalSerialConnection.
@@ -35,6 +83,9 @@ class LocalSerialConnection:
 
         :raises: Exception Board is in use (connection refused).
         """
+        port = re.search(r"/dev/tty\S+", self.conn_cmd)
+        if port:
+            set_low_latency(port.group())
         bft_pexpect_helper.spawn.__init__(
             self.device, command="/bin/bash", args=["-c", self.conn_cmd]
         )
@@ -15,6 +15,7 @@ import pexpect
 
 from boardfarm.lib.bft_pexpect_helper import bft_pexpect_helper
 from boardfarm.lib.common import cmd_exists
+from boardfarm.lib.contingency_cache import invalidate_acs
 
 from . import openwrt_router
 
@@ -254,6 +255,8 @@ class Qemu(openwrt_router.OpenWrtRouter):
 
     def reset(self):
         """Reset the qemu board. Use the system_reset command to reset."""
+        # the board drops its ACS session, check it again before the next test
+        invalidate_acs()
         self.sendcontrol("a")
         self.send("c")
         self.sendline("system_reset")
@@ -1,7 +1,51 @@
+import os
+import shutil
+import stat
+
 import pexpect
 
 from boardfarm.lib.bft_pexpect_helper import bft_pexpect_helper
 
+# where a ser2net running on this host may expose a unix socket per console,
+# named <device name>-<telnet port>.sock
+SOCKET_DIR = "/var/run/boardfarm"
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+
+def local_console_socket(device_name, conn_cmd, socket_dir=SOCKET_DIR):
+    """Return the unix socket serving a local console, if any.
+
+    When the console is served by a ser2net on this very host, talking to it
+    via a unix socket avoids going through the TCP/IP loopback.
+
+    :param device_name: name of the device, the socket is
+        <device_name>-<port>.sock, as a device may have several consoles
+    :type device_name: string
+    :param conn_cmd: the telnet command used to connect to the console
+    :type conn_cmd: string
+    :param socket_dir: directory holding the sockets, defaults to SOCKET_DIR
+    :type socket_dir: string
+    :return: path of the socket if the console is local and it exists
+    :rtype: string or None
+    """
+    if not device_name:
+        return None
+    args = conn_cmd.split()
+    hosts = [i for i, arg in enumerate(args) if arg in LOCAL_HOSTS]
+    # telnet <host> <port>
+    if not hosts or len(args) <= hosts[0] + 1 or not args[hosts[0] + 1].isdigit():
+        return None
+    port = args[hosts[0] + 1]
+    path = os.path.join(socket_dir, f"{device_name}-{port}.sock")
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return None
+    except OSError:
+        return None
+    if shutil.which("socat") is None:
+        return None
+    return path
+
 
 class Ser2NetConnection:
     """Allow telnet and tcp sessions to be established with a \
@@ -34,6 +78,21 @@ class Ser2NetConnection:
 
         :raises: Exception Board is in use (connection refused). / Password required and not supported
         """
+        socket_path = None
+        if "telnet" in self.conn_cmd:
+            socket_path = local_console_socket(
+                getattr(self.device, "name", None), self.conn_cmd
+            )
+        # close() needs to know how the console was reached
+        self.device.console_socket = socket_path
+        if socket_path:
+            bft_pexpect_helper.spawn.__init__(
+                self.device,
+                command="socat",
+                args=["STDIO,raw,echo=0", f"UNIX-CONNECT:{socket_path}"],
+            )
+            # no telnet banner to wait for, the console is ready
+            return True
         if "telnet" in self.conn_cmd:
             bft_pexpect_helper.spawn.__init__(
                 self.device, command="/bin/bash", args=["-c", self.conn_cmd]
@@ -69,7 +128,10 @@ class Ser2NetConnection:
     def close(self, force=True):
         """Close the connection."""
         try:
-            if "telnet" in self.conn_cmd:
+            if getattr(self, "console_socket", None):
+                # socat has no escape sequence, it exits along with its stdin
+                pass
+            elif "telnet" in self.conn_cmd:
                 self.sendcontrol("]")
                 self.sendline("q")
             else:
@@ -6,7 +6,7 @@ import re
 import sys
 import uuid
 from collections import UserList
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 
 from aenum import Enum, extend_enum
 
@@ -178,6 +178,8 @@ class device_manager(UserList):
         super().__init__()
         # List of current devices, which we prefer to reuse instead of creating new ones
         self.devices: List[device_descriptor] = []
+        # Lazily built index of self.devices by type, see _devices_by_type()
+        self._type_index: Optional[Dict[Any, List[device_descriptor]]] = None
         # Devices that can create other devices, we store them for later
         # so we can use them to create devices that might not already exist
         self.factories = []
@@ -212,6 +214,7 @@ class device_manager(UserList):
     def data(self, x):
         """To clear/initialize the list of devices."""
         self.devices = x
+        self._type_index = None
 
     def set_device_array(self, array_name, dev, override):
         """Set Device Array details."""
@@ -243,6 +246,7 @@ class device_manager(UserList):
                 )
         # erase device list
         self.devices = []
+        self._type_index = None
 
     def by_type(self, t, num=1):
         """Shorthand for getting device by type."""
@@ -286,9 +290,10 @@ class device_manager(UserList):
         """Get a new device by feature and location."""
         assert num == 1, "We don't support getting more than one device currently!"
 
-        matching = self.devices[:]
         if t is not None:
-            matching[:] = [d for d in matching if d.type == t]
+            matching = self._devices_by_type().get(t, [])[:]
+        else:
+            matching = self.devices[:]
         if feature is not None:
             matching[:] = [d for d in matching if feature in d.features]
         if location is not None:
@@ -306,6 +311,20 @@ class device_manager(UserList):
 
         return matching[0].obj
 
+    def _devices_by_type(self):
+        """Return the device descriptors grouped by type, in insertion order.
+
+        Devices are looked up by type before every test (and many times
+        within), hence the index is built once and only rebuilt when the
+        device list changes.
+        """
+        if self._type_index is None:
+            index: Dict[Any, List[device_descriptor]] = {}
+            for d in self.devices:
+                index.setdefault(d.type, []).append(d)
+            self._type_index = index
+        return self._type_index
+
     def _add_device(self, dev, override=False, plugin=False):
         """To add devices created via old method get_device()."""
         new_dev = device_descriptor()
@@ -325,6 +344,7 @@ class device_manager(UserList):
             new_dev.type = getattr(device_type, dev.name, device_type.Unknown)
         new_dev.obj = dev
         self.devices.append(new_dev)
+        self._type_index = None
 
         array_name = getattr(dev, "dev_array", None)
         if array_name:
@@ -18,6 +18,7 @@ import re
 import ssl
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Union
 
@@ -28,7 +29,7 @@ from termcolor import colored
 
 from boardfarm.dbclients import elasticlogger
 from boardfarm.dbclients.influx_wrapper import GenericWrapper
-from boardfarm.exceptions import PexpectErrorTimeout
+from boardfarm.exceptions import ContingencyCheckError, PexpectErrorTimeout
 from boardfarm.lib.bft_pexpect_helper import bft_pexpect_helper, spawn_ssh_pexpect
 from boardfarm.lib.dhcpoption import configure_option125
 from boardfarm.lib.installers import (
@@ -1265,6 +1266,44 @@ def retry_on_exception(method, args, retries=10, tout=5):
     return method(*args)
 
 
+def retry_on_exception_backoff(method, args, deadline_s=30, delay=0.5, max_delay=5):
+    """Retry a method if any exception occurs, backing off exponentially.
+
+    Unlike retry_on_exception(), the wait between attempts starts short and
+    doubles after every failure, so a service that recovers quickly is not
+    waited for longer than needed, while the overall time is bounded by the
+    deadline. Eventually, at last, throw the exception.
+    NOTE: args must be a tuple, hence a 1 arg tuple is (<arg>,)
+
+    :param method: name of the function to retry
+    :type method: Object
+    :param args: Arguments passed to the function
+    :type args: args
+    :param deadline_s: seconds after which no more retries are made, defaults to 30
+    :type deadline_s: Integer, Optional
+    :param delay: Sleep time after the first exception, defaults to 0.5
+    :type delay: Float, Optional
+    :param max_delay: Upper bound of the sleep time between retries, defaults to 5
+    :type max_delay: Float, Optional
+    :return: Output of the function
+    :rtype: Any data type
+    """
+    deadline = time.monotonic() + deadline_s
+    attempt = 0
+    while True:
+        try:
+            return method(*args)
+        except Exception as e:  # pylint: disable=broad-except
+            attempt += 1
+            if time.monotonic() + delay > deadline:
+                raise
+            logger.debug(
+                colored("method failed %d time (%s)" % (attempt, e), attrs=["bold"])
+            )
+            time.sleep(delay)
+            delay = min(delay * 2, max_delay)
+
+
 def resolv_dict(dic, key):
     """Get the value from gui json, replacement of eval.
 
@@ -1818,9 +1857,45 @@ def check_prompts(device_list):
     :type device: List
     """
     for dev in device_list:
-        assert "FOO" in dev.check_output(
-            'echo "FOO"'
-        ), f"Failed to validate prompt for device: {dev.name}"
+        _check_one_prompt(dev)
+    return True
+
+
+def _check_one_prompt(dev):
+    """Check to verify prompt of a single device.
+
+    :param dev: device to check
+    :type dev: object
+    """
+    assert "FOO" in dev.check_output(
+        'echo "FOO"'
+    ), f"Failed to validate prompt for device: {dev.name}"
+
+
+def check_prompts_parallel(device_list):
+    """Check to verify prompt of devices, concurrently.
+
+    Same as check_prompts(), but the devices are checked in parallel, as each
+    check only waits on its own console.
+
+    :param device_list: List of devices to check
+    :type device: List
+    :raises ContingencyCheckError: listing the devices that failed the check
+    """
+    if not device_list:
+        return True
+    failed = []
+    with ThreadPoolExecutor(max_workers=len(device_list)) as executor:
+        futures = [executor.submit(_check_one_prompt, dev) for dev in device_list]
+    for dev, future in zip(device_list, futures):
+        exc = future.exception()
+        if exc is not None:
+            logger.error("Prompt check failed for %s: %s", dev.name, exc)
+            failed.append(dev.name)
+    if failed:
+        raise ContingencyCheckError(
+            f"Failed to validate prompt for device(s): {', '.join(failed)}"
+        )
     return True
 
 
@@ -0,0 +1,94 @@
+"""Contingency check results trusted across tests.
+
+Kept free of other boardfarm imports, so that devices and test wrappers can
+invalidate the results (e.g. on reboot or on failure) without depending on
+the contingency check hooks.
+"""
+import time
+from typing import Any, Dict, List
+
+# seconds for which a successful prompt check of a device is trusted
+PROMPT_FRESHNESS = 30
+# id(device) -> time.monotonic() of the last successful prompt check
+_PROMPT_CACHE: Dict[int, float] = {}
+
+
+def stale_prompts(devices: List[Any]) -> List[Any]:
+    """Return the devices whose prompt has to be checked again.
+
+    :param devices: devices to be checked
+    :type devices: List[Any]
+    :return: the devices not successfully checked within PROMPT_FRESHNESS
+    :rtype: List[Any]
+    """
+    now = time.monotonic()
+    return [
+        dev for dev in devices if now - _PROMPT_CACHE.get(id(dev), 0) > PROMPT_FRESHNESS
+    ]
+
+
+def prompts_checked(devices: List[Any]) -> None:
+    """Record a successful prompt check of the devices.
+
+    :param devices: devices whose prompt was found
+    :type devices: List[Any]
+    """
+    now = time.monotonic()
+    for dev in devices:
+        _PROMPT_CACHE[id(dev)] = now
+
+
+def invalidate_prompts(dev: Any = None) -> None:
+    """Force the prompt of a device to be re-checked on the next test.
+
+    To be called wherever a device may have been left away from a clean
+    prompt, e.g. on reboot or when a test fails half way.
+
+    :param dev: device to invalidate, defaults to None (all devices)
+    :type dev: Any, optional
+    """
+    if dev is None:
+        _PROMPT_CACHE.clear()
+    else:
+        _PROMPT_CACHE.pop(id(dev), None)
+
+
+# seconds for which a successful ACS connection check is trusted
+ACS_OK_TTL = 60
+# id(acs_server) -> time.monotonic() until which the ACS is assumed healthy
+_ACS_OK_UNTIL: Dict[int, float] = {}
+
+
+def acs_ok(acs_server: Any) -> bool:
+    """Return True if the ACS connection was found healthy within ACS_OK_TTL.
+
+    :param acs_server: ACS device
+    :type acs_server: Any
+    :return: True if the ACS connection check can be skipped
+    :rtype: bool
+    """
+    return _ACS_OK_UNTIL.get(id(acs_server), 0) > time.monotonic()
+
+
+def acs_checked(acs_server: Any) -> None:
+    """Record a successful ACS connection check.
+
+    :param acs_server: ACS device
+    :type acs_server: Any
+    """
+    _ACS_OK_UNTIL[id(acs_server)] = time.monotonic() + ACS_OK_TTL
+
+
+def invalidate_acs(acs_server: Any = None) -> None:
+    """Force the ACS connection to be re-checked on the next test.
+
+    To be called wherever the CPE may have dropped its ACS session, e.g. on
+    reboot or factory reset.
+
+    :param acs_server: ACS to invalidate, defaults to None (all of them)
+    :type acs_server: Any, optional
+    """
+    if acs_server is None:
+        _ACS_OK_UNTIL.clear()
+    else:
+        _ACS_OK_UNTIL.pop(id(acs_server), None)
@@ -1,5 +1,5 @@
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 from boardfarm.exceptions import BftEnvExcKeyError, BftEnvMismatch
 
@@ -30,6 +30,7 @@ class EnvHelper:
 
     def __init__(self, env, mirror=None):
         """Instance initialization."""
+        self._cache: Dict[str, Any] = {}
         if env is None:
             return
 
@@ -84,6 +85,24 @@ class EnvHelper:
         if mirror:
             self.mirror = mirror
 
+    def memoize(self, key: str, func: Callable[[], Any]) -> Any:
+        """Return the value computed by func, calling it only the first time.
+
+        The environment is fixed for the whole run, hence values derived from
+        it (e.g. the provisioning mode) can be computed once and reused by
+        every test.
+
+        :param key: name under which the value is cached
+        :type key: str
+        :param func: callable computing the value from the environment
+        :type func: Callable[[], Any]
+        :return: the cached value
+        :rtype: Any
+        """
+        if key not in self._cache:
+            self._cache[key] = func()
+        return self._cache[key]
+
     def get_image(self, mirror=True):
         """Get image.
 
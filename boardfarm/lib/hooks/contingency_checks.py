@@ -2,23 +2,177 @@
 
 
 import logging
-
-from nested_lookup import nested_lookup
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
 
 from boardfarm.exceptions import ContingencyCheckError, SkipTest
-from boardfarm.lib.common import check_prompts, retry_on_exception
+from boardfarm.lib.common import check_prompts_parallel, retry_on_exception_backoff
+from boardfarm.lib.contingency_cache import (
+    acs_checked,
+    acs_ok,
+    invalidate_acs,
+    invalidate_prompts,
+    prompts_checked,
+    stale_prompts,
+)
 from boardfarm.lib.DeviceManager import device_type
 from boardfarm.lib.hooks import contingency_impl, hookimpl
 from boardfarm.plugins import BFPluginManager
 
 logger = logging.getLogger("tests_logger")
 
+# environment_def keys the contingency checks branch on
+_ENV_KEYS = ("DNS", "cwmp_version", "multicast_server_count")
+# [env_req, keys collected from it] for the test currently being checked
+_ENV_KEYS_CACHE: List[Any] = [None, None]
+
+
+def _collect_env_keys(
+    env_def: Any, keys: Iterable[str] = _ENV_KEYS
+) -> Dict[str, List[Any]]:
+    """Look up several keys in a nested document with a single sweep.
+
+    The values are returned in the same order nested_lookup() would return
+    them, but the document is walked once instead of once per key.
+
+    :param env_def: nested dict/list document, e.g. the environment_def
+    :type env_def: Any
+    :param keys: keys to look for, defaults to _ENV_KEYS
+    :type keys: Iterable[str]
+    :return: for each key, the list of values found
+    :rtype: Dict[str, List[Any]]
+    """
+    found: Dict[str, List[Any]] = {key: [] for key in keys}
+
+    def _walk(node):
+        if isinstance(node, list):
+            for item in node:
+                _walk(item)
+        elif isinstance(node, dict):
+            for key, value in node.items():
+                if key in found:
+                    found[key].append(value)
+                if isinstance(value, (dict, list)):
+                    _walk(value)
+
+    _walk(env_def)
+    return found
+
+
+def _get_env_keys(env_req: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """Return the _ENV_KEYS values of env_req, collecting them only once."""
+    if _ENV_KEYS_CACHE[0] is not env_req:
+        _ENV_KEYS_CACHE[:] = [
+            env_req,
+            _collect_env_keys(env_req.get("environment_def", {})),
+        ]
+    return _ENV_KEYS_CACHE[1]
+
+
+def _get_acs_dns(env_req: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the DNS ACS_SERVER section of env_req, None if there is none.
+
+    The section is read straight from environment_def["DNS"]["ACS_SERVER"];
+    the nested lookup is only used for environments not following that
+    layout.
+    """
+    try:
+        return env_req["environment_def"]["DNS"]["ACS_SERVER"] or None
+    except (KeyError, TypeError):
+        pass
+    dns_env = _get_env_keys(env_req)["DNS"]
+    if not dns_env:
+        return None
+    if isinstance(dns_env[0], dict) and "ACS_SERVER" in dns_env[0]:
+        return dns_env[0]["ACS_SERVER"] or None
+    # the first DNS section may also be a list of sections
+    acs_dns = _collect_env_keys(dns_env[0], ("ACS_SERVER",))["ACS_SERVER"]
+    return acs_dns[0] or None if acs_dns else None
+
 
 class ContingencyCheck:
     """Contingency check implementation."""
 
     impl_type = "base"
 
+    # feature plugin manager and service check implementations, loaded
+    # on first use and then reused by every contingency check
+    _feature_pm = None
+    _feature_impls: Dict[str, Any] = {}
+
+    @classmethod
+    def _get_feature_pm(cls):
+        """Return the contingency feature plugin manager and implementations.
+
+        Loading the hook specs and implementations scans all the boardfarm
+        plugins, hence it is done only once. Each contingency check registers
+        the service checks it needs and unregisters them afterwards.
+        """
+        if cls._feature_pm is None:
+            pm = BFPluginManager("contingency")
+            # this will load all feature hooks for contingency
+            pm.load_hook_specs("feature")
+            cls._feature_impls = pm.fetch_impl_classes("feature")
+            # BFPluginManager re-initialises the named instance on every
+            # lookup, so keep this one private to avoid losing its hookspecs
+            BFPluginManager.remove_plugin_manager("contingency")
+            cls._feature_pm = pm
+        return cls._feature_pm, cls._feature_impls
+
+    @staticmethod
+    def _run_service_checks(pm, **kwargs):
+        """Call the registered service checks, overlapping the independent ones.
+
+        The checks are split in pluggy call order into:
+        - DefaultChecks, run first, as the other checks rely on sane prompts,
+          followed by Cwmp and Multicast, which may skip the test: this avoids
+          setting up the LAN/WAN clients for a test that will not run
+        - CheckInterface, which only drives the LAN/WAN clients
+        - all the others, run one after the other as they share the DUT console
+        The last two groups run concurrently, CheckInterface on a worker
+        thread and the others on the calling thread. As with pluggy, the non-None
+        results are returned in call order, and the first exception (in call
+        order) is raised as is.
+        """
+        # pluggy calls the hook implementations in reverse order
+        impls = list(reversed(pm.hook.service_check.get_hookimpls()))
+        first = [i for i in impls if isinstance(i.plugin, DefaultChecks)]
+        first += [i for i in impls if isinstance(i.plugin, (Cwmp, Multicast))]
+        overlapping = [i for i in impls if isinstance(i.plugin, CheckInterface)]
+        serial = [i for i in impls if i not in first and i not in overlapping]
+
+        def _call_in_order(group):
+            results = []
+            for impl in group:
+                res = impl.function(**{arg: kwargs[arg] for arg in impl.argnames})
+                if res is not None:
+                    results.append(res)
+            return results
+
+        result = _call_in_order(first)
+        # only CheckInterface goes to a worker thread: the other checks stay
+        # on the calling thread (e.g. for the test name lookups done via
+        # inspect.stack() and for signal based timeouts). Should they raise,
+        # the executor context still waits for CheckInterface.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            overlapping_future = executor.submit(_call_in_order, overlapping)
+            serial_result = _call_in_order(serial)
+        # CheckInterface is trylast, so the serial checks come first
+        return result + serial_result + overlapping_future.result()
+
+    @classmethod
+    def invalidate(cls, dev=None):
+        """Force the prompt of a device to be re-checked on the next test.
+
+        See boardfarm.lib.contingency_cache.invalidate_prompts(), which
+        device and test code should call directly.
+
+        :param dev: device to invalidate, defaults to None (all devices)
+        :type dev: object, optional
+        """
+        invalidate_prompts(dev)
+
     @hookimpl(tryfirst=True)
     def contingency_check(self, env_req, dev_mgr, env_helper):
         """Register service check plugins based on env_req.
@@ -35,41 +189,47 @@ class ContingencyCheck:
         """
 
         logger.info("Executing all contingency service checks under boardfarm")
-        # initialize a feature Plugin Manager for Contingency check
-        pm = BFPluginManager("contingency")
-        # this will load all feature hooks for contingency
-        pm.load_hook_specs("feature")
-        all_impls = pm.fetch_impl_classes("feature")
+        pm, all_impls = self._get_feature_pm()
 
         plugins_to_register = [all_impls["boardfarm.DefaultChecks"]]
 
+        # the env_req may have been changed in place since the previous test,
+        # hence always collect the keys afresh here; the service checks
+        # below reuse them
+        _ENV_KEYS_CACHE[:] = [None, None]
+        found = _get_env_keys(env_req)
+
         # referencing this from boardfarm-lgi
-        dns_env = nested_lookup("DNS", env_req.get("environment_def", {}))
-        if dns_env:
+        if found["DNS"]:
             plugins_to_register.append(all_impls["boardfarm.DNS"])
 
-        if nested_lookup("cwmp_version", env_req.get("environment_def", {})):
+        if found["cwmp_version"]:
             plugins_to_register.append(all_impls["boardfarm.Cwmp"])
 
         # ACS reference from boardfarm-lgi
         if "tr-069" in env_req.get("environment_def", {}):
             plugins_to_register.append(all_impls["boardfarm.ACS"])
 
-        if nested_lookup("multicast_server_count", env_req.get("environment_def", {})):
+        if found["multicast_server_count"]:
             plugins_to_register.append(all_impls["boardfarm.Multicast"])
 
         plugins_to_register.append(all_impls["boardfarm.CheckInterface"])
 
         # since Pluggy executes plugin in LIFO order of registration
         # reverse the list so that Default check is executed first
-        for i in reversed(plugins_to_register):
-            pm.register(i)
-        result = pm.hook.service_check(
-            env_req=env_req, dev_mgr=dev_mgr, env_helper=env_helper
-        )
-
-        # this needs to be orchestrated by hook wrapper maybe
-        BFPluginManager.remove_plugin_manager("contingency")
+        # (_run_service_checks follows the same order)
+        try:
+            for i in reversed(plugins_to_register):
+                pm.register(i)
+            result = self._run_service_checks(
+                pm, env_req=env_req, dev_mgr=dev_mgr, env_helper=env_helper
+            )
+        finally:
+            # leave the plugin manager empty for the next test, even if
+            # registering failed half way
+            for i in plugins_to_register:
+                if pm.is_registered(i):
+                    pm.unregister(i)
         return result
 
 
@@ -97,7 +257,10 @@ class DefaultChecks:
             softphone = dev_mgr.by_type(device_type.softphone)
             wan_devices = wan_devices + [sipserver, softphone]
 
-        check_prompts(wan_devices + lan_devices)
+        stale = stale_prompts(wan_devices + lan_devices)
+        if stale:
+            check_prompts_parallel(stale)
+            prompts_checked(stale)
 
         logger.info("Default service check [check_prompts] for BF executed")
 
@@ -117,38 +280,49 @@ class CheckInterface:
         wan = dev_mgr.by_type(device_type.wan)
         lan_devices = [dev_mgr.lan, dev_mgr.lan2]
 
-        def call_lan_clients(dev, flags, **kwargs):
+        def _lan_client_flags():
+            prov_mode = (
+                env_helper.get_prov_mode() if env_helper.has_prov_mode() else "dual"
+            )
+            flags = []
+            if env_helper.is_dhcpv4_enabled_on_lan():
+                flags.append("ipv4")
+            if prov_mode != "ipv4" and prov_mode != "none":
+                flags.append("ipv6")
+            return flags
+
+        flags = env_helper.memoize("lan_client_flags", _lan_client_flags)
+
+        def call_lan_clients(dev):
+            dev.configure_docker_iface()
             ip_lan = {}
             call = {
                 "ipv4": dev.start_ipv4_lan_client,
                 "ipv6": dev.start_ipv6_lan_client,
             }
+            prep_iface = True
             for i in flags:
-                out = call[i](**kwargs)
+                out = call[i](prep_iface=prep_iface)
                 assert out, f"{dev.name} failed to get {i} address!!"
                 ip_lan[i] = out
                 # We need to restart DUT interface only once
-                kwargs["prep_iface"] = False
-            ip[dev.name] = ip_lan
-
-        prov_mode = env_helper.get_prov_mode() if env_helper.has_prov_mode() else "dual"
-        flags = []
-        if env_helper.is_dhcpv4_enabled_on_lan():
-            flags.append("ipv4")
-        if prov_mode != "ipv4" and prov_mode != "none":
-            flags.append("ipv6")
-
-        for dev in lan_devices:
-            dev.configure_docker_iface()
-            call_lan_clients(dev, flags, prep_iface=True)
+                prep_iface = False
             dev.configure_proxy_pkgs()
+            return ip_lan
 
         def _setup_as_wan_gateway():
-            ipv4 = wan.get_interface_ipaddr(wan.iface_dut)
-            ipv6 = wan.get_interface_ip6addr(wan.iface_dut)
-            return {"ipv4": ipv4, "ipv6": ipv6}
-
-        ip["wan"] = _setup_as_wan_gateway()
+            return wan.get_interface_ipaddrs(wan.iface_dut)
+
+        # each LAN client waits on its own DHCP exchange, and the WAN does not
+        # depend on them, hence all of them are run concurrently
+        with ThreadPoolExecutor(max_workers=len(lan_devices) + 1) as executor:
+            wan_future = executor.submit(_setup_as_wan_gateway)
+            lan_futures = [
+                executor.submit(call_lan_clients, dev) for dev in lan_devices
+            ]
+        for dev, future in zip(lan_devices, lan_futures):
+            ip[dev.name] = future.result()
+        ip["wan"] = wan_future.result()
 
         logger.info("CheckInterface service checks for BF executed")
 
@@ -166,6 +340,11 @@ class DNS:
 
         logger.info("Executing DNS service check for BF")
 
+        acs_dns = _get_acs_dns(env_req)
+        if not acs_dns:
+            logger.info("DNS service checks for BF executed")
+            return
+
         board = dev_mgr.by_type(device_type.DUT)
         acs = dev_mgr.by_type(device_type.acs_server)
 
@@ -173,41 +352,34 @@ class DNS:
         ipv6_address = acs.get_interface_ip6addr(acs.iface_dut)
         ipv4_address_aux = acs.get_interface_ipaddr(acs.aux_iface_dut)
         ipv6_address_aux = acs.get_interface_ip6addr(acs.aux_iface_dut)
-        dns_env = nested_lookup("DNS", env_req["environment_def"])
-        prov_mode = env_helper.get_prov_mode()
-        if nested_lookup("ACS_SERVER", dns_env):
-            acs_dns = dns_env[0]["ACS_SERVER"]
-
-        if acs_dns:
-            output = board.dns.nslookup("acs_server.boardfarm.com")
-            ipv4 = nested_lookup("ipv4", acs_dns)
-            ipv6 = nested_lookup("ipv6", acs_dns)
-
-            if ipv6[0].get("reachable", 0) > 0 and prov_mode == "ipv4":
-                output["domain_ip_addr"] = [
-                    ip
-                    for ip in output["domain_ip_addr"]
-                    if ip not in (ipv6_address, ipv6_address_aux)
-                ]
-            elif ipv4[0].get("reachable", 0) > 0 and prov_mode == "ipv6":
-                output["domain_ip_addr"] = [
-                    ip
-                    for ip in output["domain_ip_addr"]
-                    if ip not in (ipv4_address, ipv4_address_aux)
-                ]
-
-            total_reachable = (
-                ipv4[0].get("reachable", 0) if (ipv4 and prov_mode == "ipv4") else 0
-            ) + (ipv6[0].get("reachable", 0) if (ipv6 and prov_mode == "ipv6") else 0)
-            total_unreachable = (
-                ipv4[0].get("unreachable", 0) if (ipv4 and prov_mode == "ipv4") else 0
-            ) + (ipv6[0].get("unreachable", 0) if (ipv6 and prov_mode == "ipv6") else 0)
-            if not board.domain_ip_reach_check(
-                total_reachable, total_unreachable, output
-            ):
-                raise ContingencyCheckError(
-                    "DNS check for ipv4/ipv6 reachability failed"
-                )
+        exclude_v4 = frozenset((ipv4_address, ipv4_address_aux))
+        exclude_v6 = frozenset((ipv6_address, ipv6_address_aux))
+        prov_mode = env_helper.memoize("prov_mode", env_helper.get_prov_mode)
+
+        if "ipv4" in acs_dns or "ipv6" in acs_dns:
+            ipv4 = acs_dns.get("ipv4") or {}
+            ipv6 = acs_dns.get("ipv6") or {}
+        else:
+            acs_ips = _collect_env_keys(acs_dns, ("ipv4", "ipv6"))
+            ipv4 = acs_ips["ipv4"][0] if acs_ips["ipv4"] else {}
+            ipv6 = acs_ips["ipv6"][0] if acs_ips["ipv6"] else {}
+
+        output = board.dns.nslookup("acs_server.boardfarm.com")
+        if ipv6.get("reachable", 0) > 0 and prov_mode == "ipv4":
+            output["domain_ip_addr"] = [
+                ip for ip in output["domain_ip_addr"] if ip not in exclude_v6
+            ]
+        elif ipv4.get("reachable", 0) > 0 and prov_mode == "ipv6":
+            output["domain_ip_addr"] = [
+                ip for ip in output["domain_ip_addr"] if ip not in exclude_v4
+            ]
+
+        # only the addresses of the provisioned IP family are accounted for
+        counts = {"ipv4": ipv4, "ipv6": ipv6}.get(prov_mode, {})
+        total_reachable = counts.get("reachable", 0)
+        total_unreachable = counts.get("unreachable", 0)
+        if not board.domain_ip_reach_check(total_reachable, total_unreachable, output):
+            raise ContingencyCheckError("DNS check for ipv4/ipv6 reachability failed")
 
         logger.info("DNS service checks for BF executed")
 
@@ -217,6 +389,18 @@ class ACS:
 
     impl_type = "feature"
 
+    @staticmethod
+    def invalidate_acs_cache(acs_server=None):
+        """Force the ACS connection to be re-checked on the next test.
+
+        See boardfarm.lib.contingency_cache.invalidate_acs(), which device
+        code should call directly.
+
+        :param acs_server: ACS to invalidate, defaults to None (all of them)
+        :type acs_server: object, optional
+        """
+        invalidate_acs(acs_server)
+
     @contingency_impl
     def service_check(self, env_req, dev_mgr):
         """Implement Contingency Hook for ACS."""
@@ -231,14 +415,18 @@ class ACS:
             board.get_cpeid()
 
         def check_acs_connection():
-            return bool(
-                retry_on_exception(
-                    acs_server.GPV,
-                    ("Device.DeviceInfo.SoftwareVersion",),
-                    retries=10,
-                    tout=30,
-                )
+            if acs_ok(acs_server):
+                return True
+            # same overall budget as the former 10 retries every 30s
+            out = retry_on_exception_backoff(
+                acs_server.GPV,
+                ("Device.DeviceInfo.SoftwareVersion",),
+                deadline_s=300,
+                max_delay=30,
             )
+            if out:
+                acs_checked(acs_server)
+            return bool(out)
 
         acs_connection = check_acs_connection()
         if not acs_connection:
@@ -264,7 +452,7 @@ class Cwmp:
         logger.info("Executing CWMP service check for BF Docsis")
 
         board = dev_mgr.by_type(device_type.DUT)
-        env_cwmp_v = nested_lookup("cwmp_version", env_req["environment_def"])
+        env_cwmp_v = _get_env_keys(env_req)["cwmp_version"]
         if env_cwmp_v[0] != board.cwmp_version():
             raise SkipTest("Skipping Test: CWMP version mismatch")
 
@@ -280,9 +468,7 @@ class Multicast:
 
         logger.info("Executing multicast server count check BF Docsis")
 
-        server_count = nested_lookup(
-            "multicast_server_count", env_req["environment_def"]
-        )
+        server_count = _get_env_keys(env_req)["multicast_server_count"]
         if server_count[0] < 1:
             raise SkipTest(
                 "Skipping Test: Required multicast server count is not specified"
@@ -1,15 +1,34 @@
 import abc
 import inspect
+import os
+from functools import lru_cache
+
+# Skip the signature validation of derived classes (e.g. in production runs
+# where the device classes are known to be correct).
+BFT_DISABLE_SIGNATURE_CHECK = "BFT_DISABLE_SIGNATURE_CHECK" in os.environ
+
+
+@lru_cache(maxsize=None)
+def _argspec(func):
+    """Return (and cache) the argspec of a function.
+
+    The abstract methods of a template are inspected again for every class
+    derived from it, hence they are cached.
+    """
+    return inspect.getfullargspec(func)
 
 
 class __MetaSignatureChecker(abc.ABCMeta):  # noqa: B024
     def __init__(cls, name, bases, attrs):
+        if BFT_DISABLE_SIGNATURE_CHECK:
+            super().__init__(name, bases, attrs)
+            return
         errors = []
         for base_cls in bases:
             for meth_name in getattr(base_cls, "__abstractmethods__", ()):
                 if not callable(getattr(base_cls, meth_name)):
                     continue
-                orig_argspec = inspect.getfullargspec(getattr(base_cls, meth_name))
+                orig_argspec = _argspec(getattr(base_cls, meth_name))
                 target_argspec = inspect.getfullargspec(getattr(cls, meth_name))
                 if orig_argspec != target_argspec:
                     errors.append(
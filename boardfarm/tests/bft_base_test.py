@@ -22,6 +22,7 @@ import boardfarm.lib.env_helper
 import boardfarm.lib.test_configurator
 from boardfarm import lib
 from boardfarm.lib.bft_logging import now_short
+from boardfarm.lib.contingency_cache import invalidate_prompts
 from boardfarm.library import check_devices
 from boardfarm.orchestration import TearDown
 
@@ -321,6 +322,9 @@ class BftBaseTest(inherit_class):
             return
         except Exception as e:
             self.stop_time = time.time()
+            # the test may have stopped half way through a console command,
+            # hence the next contingency check must verify all the prompts
+            invalidate_prompts()
 
             print(
                 "\n\n=========== Test: %s failed! running Device status check! Time: %s ==========="
@@ -1,8 +1,14 @@
+import asyncio
 import sys
 
 import pytest
 
-from boardfarm.devices.base_devices.board_templates import BoardTemplate
+from boardfarm.devices.base_devices.board_templates import (
+    BoardTemplate,
+    ConsoleTemplate,
+)
+from boardfarm.exceptions import PexpectErrorTimeout
+from boardfarm.lib.bft_pexpect_helper import bft_pexpect_helper
 
 
 @pytest.fixture
@@ -160,3 +166,125 @@ def test_instantiate_derived_board():
             return super().close()
 
     board = MyBoard()  # noqa: F841
+
+
+class CatConsole(ConsoleTemplate):
+    """Console echoing back whatever is sent to it."""
+
+    def __init__(self, conn_type: str, conn_cmd: str, **kwargs):
+        super().__init__(conn_type, conn_cmd, **kwargs)
+
+    def spawn_device(self, **kwargs):
+        """No connection object needed, connect() spawns cat directly."""
+
+    def connect(self):
+        bft_pexpect_helper.spawn.__init__(
+            self, command="/bin/bash", args=["-c", self.conn_cmd]
+        )
+
+    def close(self):
+        bft_pexpect_helper.close(self)
+
+
+def test_console_async_expect():
+    consoles = [CatConsole("local_cmd", "cat") for _ in range(3)]
+    for c in consoles:
+        c.connect()
+
+    async def ping_all():
+        await asyncio.gather(
+            *[c.sendline_async(f"ping{i}") for i, c in enumerate(consoles)]
+        )
+        matched = await asyncio.gather(
+            *[c.expect_async(f"ping{i}", timeout=5) for i, c in enumerate(consoles)]
+        )
+        with pytest.raises(PexpectErrorTimeout):
+            await consoles[0].expect_async("pong", timeout=0.5)
+        return matched
+
+    try:
+        assert asyncio.run(ping_all()) == [0, 0, 0]
+    finally:
+        for c in consoles:
+            c.close()
+
+
+def test_console_async_expect_new_loop():
+    console = CatConsole("local_cmd", "cat")
+    console.connect()
+
+    async def ping(i):
+        await console.sendline_async(f"ping{i}")
+        return await console.expect_async(f"ping{i}", timeout=5)
+
+    try:
+        # each asyncio.run() call runs a new event loop
+        assert asyncio.run(ping(0)) == 0
+        assert asyncio.run(ping(1)) == 0
+        assert console.isalive()
+    finally:
+        console.close()
+
+
+def test_console_expect_prompt():
+    cmd = "printf 'x%.0s' {1..10000}; echo ' root@board:~# '; cat"
+    console = CatConsole("local_cmd", cmd, prompt=[r"root@\w+:~# "])
+    console.connect()
+    try:
+        console.expect_prompt(timeout=5)
+        assert console.before == "x" * 10000 + " "
+        console.prompt = ["pong"]
+        console.sendline("pong")
+        assert console.expect(None, 5) == 0
+    finally:
+        console.close()
+
+
+def test_console_prompt_changed_in_place():
+    console = CatConsole("local_cmd", "cat", prompt=["aaa"])
+    console.connect()
+    try:
+        # each line is seen twice: echoed by the tty, then printed by cat
+        console.sendline("aaa")
+        console.expect_prompt(timeout=5)
+        console.expect_prompt(timeout=5)
+        console.prompt.append("bbb")
+        console.sendline("bbb")
+        assert console.expect(None, 5) == 1
+        assert console.expect(console.prompt, 5) == 1
+    finally:
+        console.close()
+
+
+class SlowCatConsole(CatConsole):
+    fast_io = False
+
+
+@pytest.mark.parametrize(
+    "console_cls, delay",
+    [(CatConsole, None), (SlowCatConsole, 0.05)],
+)
+def test_console_fast_io(console_cls, delay):
+    console = console_cls("local_cmd", "cat")
+    console.connect()
+    try:
+        assert console.delaybeforesend == delay
+        console.delaybeforesend = 0.1
+        assert console.delaybeforesend == 0.1
+    finally:
+        console.close()
+
+
+def test_console_prompt_flags():
+    console = CatConsole(
+        "local_cmd", "echo 'ROOT@X'; echo '#'; cat", prompt=["root@x..#"]
+    )
+    console.connect()
+    try:
+        # as pexpect, DOTALL always, IGNORECASE if ignorecase is set
+        with pytest.raises(PexpectErrorTimeout):
+            console.expect_prompt(timeout=1)
+        console.ignorecase = True
+        console.expect_prompt(timeout=1)
+    finally:
+        console.close()
@@ -256,3 +256,37 @@ def test_get_interface_mask(mocker, output, expected_mask):
     dev.match = max((re.search(i, output) for i in regex), key=bool)
     print(dev.match)
     assert expected_mask == dev.get_interface_mask("erouter0")
+
+
+ip_json_1 = """[{"ifindex":3,"ifname":"eth1","flags":["BROADCAST","MULTICAST","UP"],\
+"addr_info":[{"family":"inet","local":"10.64.38.20","prefixlen":23,\
+"scope":"global"},{"family":"inet6","local":"fe80::5836:bbff:feeb:776",\
+"prefixlen":64,"scope":"link"},{"family":"inet6",\
+"local":"2001:730:1f:60a::cafe:20","prefixlen":64,"scope":"global"}]}]"""
+
+
+@pytest.mark.parametrize(
+    "output, fallback",
+    [
+        (ip_json_1, False),
+        ('Option "-j" is unknown, try "ip -help".', True),
+        ('[{"ifindex":3,"ifname":"eth1","addr_info":[]}]', True),
+    ],
+)
+def test_get_interface_ipaddrs(mocker, output, fallback):
+    mocker.patch.object(LinuxDevice, "__init__", return_value=None, autospec=True)
+    mocker.patch.object(LinuxDevice, "check_output", return_value=output, autospec=True)
+    v4 = mocker.patch.object(
+        LinuxDevice, "get_interface_ipaddr", return_value="10.64.38.20"
+    )
+    v6 = mocker.patch.object(
+        LinuxDevice, "get_interface_ip6addr", return_value="2001:730:1f:60a::cafe:20"
+    )
+
+    dev = LinuxDevice()
+
+    assert dev.get_interface_ipaddrs("eth1") == {
+        "ipv4": "10.64.38.20",
+        "ipv6": "2001:730:1f:60a::cafe:20",
+    }
+    assert v4.called == v6.called == fallback
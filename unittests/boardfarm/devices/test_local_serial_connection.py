@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from boardfarm.devices.local_serial_connection import (
+    ASYNC_LOW_LATENCY,
+    TIOCGSERIAL,
+    TIOCSSERIAL,
+    set_low_latency,
+)
+
+
+def open_fds():
+    return len(os.listdir("/proc/self/fd"))
+
+
+def test_set_low_latency_missing_port(tmp_path):
+    assert not set_low_latency(str(tmp_path / "ttyUSB0"))
+
+
+def test_set_low_latency_not_a_serial_port():
+    master, slave = os.openpty()
+    try:
+        fds = open_fds()
+        # a pty does not support TIOCGSERIAL
+        assert not set_low_latency(os.ttyname(slave))
+        assert open_fds() == fds
+    finally:
+        os.close(master)
+        os.close(slave)
+
+
+@pytest.mark.parametrize(
+    "flags, expected_flags, set_called",
+    [
+        (0, ASYNC_LOW_LATENCY, True),
+        (0x40, 0x40 | ASYNC_LOW_LATENCY, True),
+        (0x40 | ASYNC_LOW_LATENCY, 0x40 | ASYNC_LOW_LATENCY, False),
+    ],
+)
+def test_set_low_latency(mocker, flags, expected_flags, set_called):
+    requests = []
+
+    def ioctl(fd, request, buf):
+        requests.append(request)
+        if request == TIOCGSERIAL:
+            buf[4] = flags
+        else:
+            assert buf[4] == expected_flags
+
+    mocker.patch("fcntl.ioctl", side_effect=ioctl)
+
+    assert set_low_latency(os.devnull)
+    assert requests == ([TIOCGSERIAL, TIOCSSERIAL] if set_called else [TIOCGSERIAL])
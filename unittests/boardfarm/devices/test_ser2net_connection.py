@@ -1,7 +1,13 @@
+import os
+import socket
+
 import pexpect
 import pytest
 
-from boardfarm.devices.ser2net_connection import Ser2NetConnection
+from boardfarm.devices.ser2net_connection import (
+    Ser2NetConnection,
+    local_console_socket,
+)
 from boardfarm.lib.bft_pexpect_helper import bft_pexpect_helper
 
 
@@ -55,3 +61,39 @@ def test_Ser2NetConnection(mocker, device, conn_cmd, expect_retval, msg, exp_rai
         assert str(e.value) == msg
     else:
         assert conn.connect(), "Test Ser2NetConnection Failed"
+
+
+@pytest.fixture
+def socket_dir(tmp_path, mocker):
+    mocker.patch("shutil.which", return_value="/usr/bin/socat")
+    # a board with two consoles served by the local ser2net
+    socks = []
+    for port in ("7001", "7002"):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(str(tmp_path / f"board-{port}.sock"))
+        socks.append(sock)
+    yield str(tmp_path)
+    for sock in socks:
+        sock.close()
+
+
+@pytest.mark.parametrize(
+    "device_name, conn_cmd, found",
+    [
+        ("board", "telnet 127.0.0.1 7001", "board-7001.sock"),
+        ("board", "telnet localhost 7002", "board-7002.sock"),
+        ("board", "telnet 127.0.0.1 7003", None),
+        ("board", "telnet 127.0.0.1", None),
+        ("board", "telnet 10.64.40.1 7001", None),
+        ("wan", "telnet 127.0.0.1 7001", None),
+        (None, "telnet 127.0.0.1 7001", None),
+    ],
+)
+def test_local_console_socket(socket_dir, device_name, conn_cmd, found):
+    expected = os.path.join(socket_dir, found) if found else None
+    assert local_console_socket(device_name, conn_cmd, socket_dir) == expected
+
+
+def test_local_console_socket_not_a_socket(tmp_path):
+    (tmp_path / "board-7001.sock").write_text("")
+    assert not local_console_socket("board", "telnet 127.0.0.1 7001", str(tmp_path))
@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+"""Unit tests for boardfarm.lib.hooks.contingency_checks.py."""
+import threading
+from unittest import mock
+
+import pluggy
+import pytest
+
+from boardfarm.exceptions import ContingencyCheckError, SkipTest
+from boardfarm.lib import contingency_cache
+from boardfarm.lib.hooks import contingency_checks as cc
+from boardfarm.lib.hooks import contingency_impl
+from boardfarm.lib.specs.contingency_checks import ServiceCheck
+
+
+class FakeDefault(cc.DefaultChecks):
+    @contingency_impl
+    def service_check(self, env_req, dev_mgr, env_helper):
+        env_req["calls"].append(("default", dev_mgr, env_helper))
+
+
+class FakeDNS(cc.DNS):
+    @contingency_impl
+    def service_check(self, env_req, dev_mgr):
+        env_req["calls"].append(("dns", dev_mgr))
+        env_req["threads"]["dns"] = threading.get_ident()
+        if env_req.get("dns_fails"):
+            raise ContingencyCheckError("dns")
+        return "dns"
+
+
+class FakeCwmp(cc.Cwmp):
+    @contingency_impl
+    def service_check(self, env_req, dev_mgr):
+        env_req["calls"].append(("cwmp", dev_mgr))
+        if env_req.get("cwmp_skips"):
+            raise SkipTest("cwmp")
+
+
+class FakeMulticast(cc.Multicast):
+    @contingency_impl
+    def service_check(self, env_req):
+        env_req["calls"].append(("multicast",))
+
+
+class FakeInterface(cc.CheckInterface):
+    @contingency_impl(trylast=True)
+    def service_check(self, env_req, env_helper):
+        env_req["calls"].append(("interface", env_helper))
+        env_req["threads"]["interface"] = threading.get_ident()
+        if env_req.get("interface_fails"):
+            raise ValueError("interface")
+        return {"lan": "192.168.1.2"}
+
+
+@pytest.fixture
+def pm():
+    pm = pluggy.PluginManager("contingency")
+    pm.add_hookspecs(ServiceCheck)
+    # same registration order as ContingencyCheck.contingency_check()
+    plugins = [FakeDefault(), FakeDNS(), FakeCwmp(), FakeMulticast(), FakeInterface()]
+    for plugin in reversed(plugins):
+        pm.register(plugin)
+    return pm
+
+
+def run_checks(pm, **env_req):
+    env_req["calls"] = []
+    env_req["threads"] = {}
+    try:
+        return env_req, cc.ContingencyCheck._run_service_checks(
+            pm, env_req=env_req, dev_mgr="dev_mgr", env_helper="env_helper"
+        )
+    except Exception as e:
+        return env_req, e
+
+
+def test_run_service_checks_order_args_results(pm):
+    env_req, result = run_checks(pm)
+    calls = env_req["calls"]
+    # DefaultChecks and the checks that may skip the test come first
+    assert calls[:3] == [
+        ("default", "dev_mgr", "env_helper"),
+        ("cwmp", "dev_mgr"),
+        ("multicast",),
+    ]
+    assert sorted(calls[3:]) == [("dns", "dev_mgr"), ("interface", "env_helper")]
+    assert result == ["dns", {"lan": "192.168.1.2"}]
+    # only CheckInterface runs on a worker thread
+    assert env_req["threads"]["dns"] == threading.get_ident()
+    assert env_req["threads"]["interface"] != threading.get_ident()
+
+
+def test_run_service_checks_skip_before_interface(pm):
+    env_req, result = run_checks(pm, cwmp_skips=True)
+    assert isinstance(result, SkipTest)
+    assert [c[0] for c in env_req["calls"]] == ["default", "cwmp"]
+
+
+def test_run_service_checks_first_exception_wins(pm):
+    env_req, result = run_checks(pm, dns_fails=True, interface_fails=True)
+    assert isinstance(result, ContingencyCheckError)
+    # the overlapping check is still waited for
+    assert ("interface", "env_helper") in env_req["calls"]
+
+
+class BadMulticast(cc.Multicast):
+    @contingency_impl
+    def service_check(self, env_req, not_in_the_spec):
+        pass
+
+
+@pytest.mark.parametrize(
+    "multicast, raises",
+    [(FakeMulticast, None), (BadMulticast, pluggy.PluginValidationError)],
+)
+def test_contingency_check_leaves_pm_empty(mocker, multicast, raises):
+    pm = pluggy.PluginManager("contingency")
+    pm.add_hookspecs(ServiceCheck)
+    impls = {
+        "boardfarm.DefaultChecks": FakeDefault(),
+        "boardfarm.Multicast": multicast(),
+        "boardfarm.CheckInterface": FakeInterface(),
+    }
+    mocker.patch.object(
+        cc.ContingencyCheck, "_get_feature_pm", return_value=(pm, impls)
+    )
+    env_req = {
+        "environment_def": {"multicast_server_count": 1},
+        "calls": [],
+        "threads": {},
+    }
+
+    if raises:
+        with pytest.raises(raises):
+            cc.ContingencyCheck().contingency_check(env_req, "dev_mgr", "env_helper")
+    else:
+        result = cc.ContingencyCheck().contingency_check(
+            env_req, "dev_mgr", "env_helper"
+        )
+        assert result == [{"lan": "192.168.1.2"}]
+    assert pm.get_plugins() == set()
+
+
+class FakeDevMgr:
+    def __init__(self):
+        self.devices = {t: object() for t in ("wan", "provisioner")}
+        self.lan = object()
+        self.lan2 = object()
+
+    def by_type(self, t):
+        return self.devices[t.name]
+
+
+@pytest.fixture
+def prompt_checks(mocker):
+    cc.ContingencyCheck.invalidate()
+    yield mocker.patch.object(cc, "check_prompts_parallel")
+    cc.ContingencyCheck.invalidate()
+
+
+def test_default_checks_prompt_cache(prompt_checks):
+    dev_mgr = FakeDevMgr()
+    wan = dev_mgr.devices["wan"]
+    check = cc.DefaultChecks()
+
+    check.service_check({}, dev_mgr, None)
+    assert len(prompt_checks.call_args[0][0]) == 4
+    # the devices were checked within _PROMPT_FRESHNESS
+    check.service_check({}, dev_mgr, None)
+    assert prompt_checks.call_count == 1
+
+    cc.ContingencyCheck.invalidate(wan)
+    check.service_check({}, dev_mgr, None)
+    assert prompt_checks.call_args[0][0] == [wan]
+
+
+def test_default_checks_prompt_cache_failure(prompt_checks):
+    dev_mgr = FakeDevMgr()
+    check = cc.DefaultChecks()
+
+    prompt_checks.side_effect = ContingencyCheckError("prompt")
+    with pytest.raises(ContingencyCheckError):
+        check.service_check({}, dev_mgr, None)
+
+    prompt_checks.side_effect = None
+    check.service_check({}, dev_mgr, None)
+    assert len(prompt_checks.call_args[0][0]) == 4
+
+
+class FakeACSDevMgr:
+    def __init__(self, gpv):
+        self.acs = mock.Mock(GPV=mock.Mock(return_value=gpv))
+        self.board = mock.Mock(_cpeid="cpe")
+
+    def by_type(self, t):
+        return self.acs if t.name == "acs_server" else self.board
+
+
+@pytest.fixture
+def acs_check(mocker):
+    contingency_cache.invalidate_acs()
+    mocker.patch.object(
+        cc, "retry_on_exception_backoff", side_effect=lambda f, args, **_: f(*args)
+    )
+    env_req = {"environment_def": {"tr-069": {}}}
+    yield lambda dev_mgr: cc.ACS().service_check(env_req, dev_mgr)
+    contingency_cache.invalidate_acs()
+
+
+def test_acs_check_cache(acs_check):
+    dev_mgr = FakeACSDevMgr([{"value": "1.0"}])
+    gpv = dev_mgr.acs.GPV
+
+    acs_check(dev_mgr)
+    assert gpv.call_count == 1
+    # within ACS_OK_TTL
+    acs_check(dev_mgr)
+    assert gpv.call_count == 1
+
+    contingency_cache.invalidate_acs(dev_mgr.acs)
+    acs_check(dev_mgr)
+    assert gpv.call_count == 2
+
+
+def test_acs_check_cache_expiry(acs_check, monkeypatch):
+    monkeypatch.setattr(contingency_cache, "ACS_OK_TTL", 0)
+    dev_mgr = FakeACSDevMgr([{"value": "1.0"}])
+
+    acs_check(dev_mgr)
+    acs_check(dev_mgr)
+    assert dev_mgr.acs.GPV.call_count == 2
+
+
+def test_acs_check_failure_not_cached(acs_check):
+    dev_mgr = FakeACSDevMgr([])
+
+    for _ in range(2):
+        with pytest.raises(ContingencyCheckError):
+            acs_check(dev_mgr)
+    assert dev_mgr.acs.GPV.call_count == 2
+
+
+ACS_DNS = {
+    "ipv4": {"reachable": 2, "unreachable": 1},
+    "ipv6": {"reachable": 1, "unreachable": 0},
+}
+
+
+@pytest.mark.parametrize(
+    "env_def, expected",
+    [
+        ({"DNS": {"ACS_SERVER": ACS_DNS}}, ACS_DNS),
+        ({"board": {"DNS": {"ACS_SERVER": ACS_DNS}}}, ACS_DNS),
+        ({"DNS": [{"ACS_SERVER": ACS_DNS}]}, ACS_DNS),
+        ({"DNS": {"ACS_SERVER": {}}}, None),
+        ({"DNS": {"other": {}}}, None),
+        ({"board": {}}, None),
+    ],
+)
+def test_get_acs_dns(env_def, expected):
+    cc._ENV_KEYS_CACHE[:] = [None, None]
+    assert cc._get_acs_dns({"environment_def": env_def}) == expected
+
+
+ACS_IPS = {
+    "eth1": ("10.1.0.2", "2001:1::2"),
+    "eth2": ("10.2.0.2", "2001:2::2"),
+}
+NSLOOKUP_IPS = ["10.1.0.2", "10.2.0.2", "2001:1::2", "2001:2::2"]
+
+
+@pytest.mark.parametrize(
+    "prov_mode, counts, domain_ips",
+    [
+        # the addresses of the other IP family are left out
+        ("ipv4", (2, 1), NSLOOKUP_IPS[:2]),
+        ("ipv6", (1, 0), NSLOOKUP_IPS[2:]),
+        ("dual", (0, 0), NSLOOKUP_IPS),
+    ],
+)
+def test_dns_service_check(prov_mode, counts, domain_ips):
+    acs = mock.Mock(iface_dut="eth1", aux_iface_dut="eth2")
+    acs.get_interface_ipaddr.side_effect = lambda iface: ACS_IPS[iface][0]
+    acs.get_interface_ip6addr.side_effect = lambda iface: ACS_IPS[iface][1]
+    board = mock.Mock()
+    board.dns.nslookup.return_value = {"domain_ip_addr": NSLOOKUP_IPS[:]}
+    dev_mgr = mock.Mock()
+    dev_mgr.by_type.side_effect = lambda t: acs if t.name == "acs_server" else board
+    env_helper = mock.Mock()
+    env_helper.memoize.side_effect = lambda key, func: func()
+    env_helper.get_prov_mode.return_value = prov_mode
+    env_req = {"environment_def": {"DNS": {"ACS_SERVER": ACS_DNS}}}
+    cc._ENV_KEYS_CACHE[:] = [None, None]
+
+    cc.DNS().service_check(env_req, dev_mgr, env_helper)
+
+    board.domain_ip_reach_check.assert_called_once_with(
+        *counts, {"domain_ip_addr": domain_ips}
+    )
+
+
+def test_dns_service_check_failure():
+    board = mock.Mock()
+    board.domain_ip_reach_check.return_value = False
+    dev_mgr = mock.Mock()
+    dev_mgr.by_type.return_value = board
+    env_helper = mock.Mock()
+    env_helper.memoize.side_effect = lambda key, func: func()
+    env_req = {"environment_def": {"DNS": {"ACS_SERVER": ACS_DNS}}}
+    cc._ENV_KEYS_CACHE[:] = [None, None]
+
+    with pytest.raises(ContingencyCheckError):
+        cc.DNS().service_check(env_req, dev_mgr, env_helper)
+
+
+def test_dns_service_check_no_acs_server():
+    dev_mgr = mock.Mock()
+    env_req = {"environment_def": {"DNS": {"other": {}}}}
+    cc._ENV_KEYS_CACHE[:] = [None, None]
+
+    cc.DNS().service_check(env_req, dev_mgr, mock.Mock())
+
+    dev_mgr.by_type.assert_not_called()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""Unit tests for boardfarm.lib.DeviceManager.py."""
+import pytest
+
+from boardfarm.lib.DeviceManager import (
+    DeviceNone,
+    clean_device_manager,
+    device_manager,
+    device_type,
+)
+
+
+class FakeDevice:
+    """Device that does not set the legacy device manager attributes."""
+
+    legacy_add = False
+
+    def __init__(self, name):
+        self.name = name
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def mgr():
+    clean_device_manager()
+    mgr = device_manager()
+    mgr._add_device(FakeDevice("board"))
+    yield mgr
+    clean_device_manager()
+
+
+class TestDeviceManager_get_device:
+    """Suite of tests for the device_manager lookups by type."""
+
+    def test_device_added_after_lookup(self, mgr):
+        assert isinstance(mgr.by_type(device_type.wan), DeviceNone)
+        wan = FakeDevice("wan")
+        mgr._add_device(wan)
+        assert mgr.by_type(device_type.wan) is wan
+
+    def test_close_all_then_add(self, mgr):
+        wan = FakeDevice("wan")
+        mgr._add_device(wan)
+        assert mgr.by_type(device_type.wan) is wan
+        mgr.close_all()
+        assert isinstance(mgr.by_type(device_type.wan), DeviceNone)
+        board, new_wan = FakeDevice("board"), FakeDevice("wan")
+        mgr._add_device(board)
+        mgr._add_device(new_wan)
+        assert mgr.by_type(device_type.DUT) is board
+        assert mgr.by_type(device_type.wan) is new_wan
+
+    def test_data_setter(self, mgr):
+        board = mgr.by_type(device_type.DUT)
+        assert not isinstance(board, DeviceNone)
+        mgr.data = []
+        assert isinstance(mgr.by_type(device_type.DUT), DeviceNone)
+
+    def test_duplicate_types_first_hit(self, mgr):
+        lans = [FakeDevice("lan"), FakeDevice("lan")]
+        mgr._add_device(lans[0])
+        assert mgr.by_type(device_type.lan) is lans[0]
+        mgr._add_device(lans[1])
+        assert mgr.by_type(device_type.lan) is lans[0]
+        assert mgr.get_device(None, None, None) is mgr.by_type(device_type.DUT)
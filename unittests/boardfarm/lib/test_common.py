@@ -2,6 +2,7 @@
 """Unit tests for boardfarm.lib.common.py."""
 import pytest
 
+from boardfarm.exceptions import ContingencyCheckError
 from boardfarm.lib import common
 
 
@@ -49,3 +50,87 @@ class TestRetryOnException:
         """The exception is raised when no retries are specified."""
         with pytest.raises(NameError):
             common.retry_on_exception(throw_error, (), -1, tout=0)
+
+
+class FlakyCall:
+    """Callable failing a given number of times before succeeding."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, value):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise NameError
+        return value
+
+
+class TestRetryOnExceptionBackoff:
+    """Suite of tests for boardfarm.lib.common.retry_on_exception_backoff()."""
+
+    def test_retry_backoff_no_raise(self):
+        """A proper function call is made only once."""
+        method = FlakyCall(0)
+        out = common.retry_on_exception_backoff(method, (5,), delay=0)
+        assert out == 5
+        assert method.calls == 1
+
+    def test_retry_backoff_recovers(self):
+        """The output is returned once the function stops raising."""
+        method = FlakyCall(3)
+        out = common.retry_on_exception_backoff(method, (5,), delay=0.001)
+        assert out == 5
+        assert method.calls == 4
+
+    def test_retry_backoff_deadline(self):
+        """The exception is raised once the deadline would be exceeded."""
+        method = FlakyCall(100)
+        with pytest.raises(NameError):
+            common.retry_on_exception_backoff(
+                method, (5,), deadline_s=0.05, delay=0.01, max_delay=0.02
+            )
+        assert 1 < method.calls < 100
+
+    def test_retry_backoff_no_time_to_retry(self):
+        """The exception is raised when the deadline does not allow a retry."""
+        method = FlakyCall(1)
+        with pytest.raises(NameError):
+            common.retry_on_exception_backoff(method, (5,), deadline_s=0)
+        assert method.calls == 1
+
+
+class FakePromptDevice:
+    """Minimal device answering to check_output()."""
+
+    def __init__(self, name, output='echo "FOO"\r\nFOO'):
+        self.name = name
+        self.output = output
+
+    def check_output(self, cmd):
+        return self.output
+
+
+class TestCheckPromptsParallel:
+    """Suite of tests for boardfarm.lib.common.check_prompts_parallel()."""
+
+    def test_check_prompts_parallel_all_ok(self):
+        """All the devices have a working prompt."""
+        devices = [FakePromptDevice(f"dev{i}") for i in range(4)]
+        assert common.check_prompts_parallel(devices)
+
+    def test_check_prompts_parallel_no_devices(self):
+        """An empty device list is trivially fine."""
+        assert common.check_prompts_parallel([])
+
+    def test_check_prompts_parallel_failures(self):
+        """All the failing devices are reported in a single exception."""
+        devices = [
+            FakePromptDevice("lan", output="garbage"),
+            FakePromptDevice("wan"),
+            FakePromptDevice("lan2", output=""),
+        ]
+        with pytest.raises(ContingencyCheckError) as err:
+            common.check_prompts_parallel(devices)
+        assert "lan, lan2" in str(err.value)
+        assert "wan" not in str(err.value)
@@ -288,3 +288,35 @@ class TestEnvHelper_env_check:
         }
         with pytest.raises(boardfarm.exceptions.BftEnvMismatch):
             self.eh_multiple_images.env_check(tcenv)
+
+
+class TestEnvHelper_memoize:
+    """Suite of tests for boardfarm.lib.EnvHelper.memoize()."""
+
+    env = {"environment_def": {"board": {"prov_mode": "dual"}}, "version": "1.0"}
+
+    def test_memoize_computes_once(self):
+        """The value is computed on the first call only."""
+        eh = env_helper.EnvHelper(self.env)
+        calls = []
+
+        def prov_mode():
+            calls.append(1)
+            return eh.env["environment_def"]["board"]["prov_mode"]
+
+        assert eh.memoize("prov_mode", prov_mode) == "dual"
+        assert eh.memoize("prov_mode", prov_mode) == "dual"
+        assert len(calls) == 1
+
+    def test_memoize_no_env(self):
+        """The cache also exists when no env is given."""
+        eh = env_helper.EnvHelper(None)
+        assert eh.memoize("key", lambda: 1) == 1
+        assert eh.memoize("key", lambda: 2) == 1
+
+    def test_memoize_per_instance(self):
+        """Each EnvHelper has its own cache."""
+        eh1 = env_helper.EnvHelper(self.env)
+        eh2 = env_helper.EnvHelper(self.env)
+        assert eh1.memoize("key", lambda: 1) == 1
+        assert eh2.memoize("key", lambda: 2) == 2